@@ -0,0 +1,72 @@
+"""Compare json.load with extract_ra_metadata on RA JSON files with growing script sizes.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_json_scan
+
+The metadata is the same in every file, only the size of the embedded scripts changes. Peak memory is measured
+with tracemalloc, so the memory-mapped file itself (backed by the page cache) is not counted.
+"""
+import os
+import json
+import time
+import tempfile
+import tracemalloc
+
+from classes.json_scanner import extract_ra_metadata
+
+
+def make_file(directory, script_size):
+    """Write a RA JSON file with Windows and macOS scripts of ``script_size`` characters each."""
+    script = ('Write-Output "Hello \\"world\\""\n' * (script_size // 32 + 1))[:script_size]
+    data = {
+        "name": "Get Windows Information",
+        "description": "Collects information about the device. " * 5,
+        "purpose": "Troubleshooting",
+        "scriptInfo": {"scriptWindows": script, "scriptMacOs": script, "outputs": [{"name": "Result"}]},
+    }
+    path = os.path.join(directory, f"ra_{script_size}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    return path
+
+
+def json_load(path):
+    with open(path) as f:
+        data = json.load(f)
+    script_info = data.get("scriptInfo") or {}
+    return data.get("name"), bool(script_info.get("scriptWindows")), bool(script_info.get("scriptMacOs"))
+
+
+def scan(path):
+    data = extract_ra_metadata(path)
+    script_info = data.get("scriptInfo") or {}
+    return data.get("name"), bool(script_info.get("scriptWindows")), bool(script_info.get("scriptMacOs"))
+
+
+def measure(func, path, repeat=5):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(path)
+    elapsed = (time.perf_counter() - started) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'script size':>12} {'file':>10} | {'json.load':>20} | {'extract_ra_metadata':>20}")
+        for script_size in (1_000, 100_000, 1_000_000, 10_000_000):
+            path = make_file(directory, script_size)
+            assert json_load(path) == scan(path)
+            load_time, load_peak = measure(json_load, path)
+            scan_time, scan_peak = measure(scan, path)
+            print(f"{script_size:>12,} {os.path.getsize(path) / 1024 ** 2:8.2f}MB | "
+                  f"{load_time * 1000:8.2f}ms {load_peak / 1024:8.0f}KB | "
+                  f"{scan_time * 1000:8.2f}ms {scan_peak / 1024:8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compare the per-row cost of the sync loop with pandas rows and with RaRecord tuples.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_records --rows 5000
+
+"Before" is what the sync used to do: build a dataframe with pd.merge and loop with df.iterrows(), looking up
+the existing records with a dataframe mask. "After" runs the shipped code: :code:`JsonParser.records` over the
+categories dataframe, and :code:`RecordMirror.ids_for_name()` (the SQLite mirror) for the existing records.
+The parser is created without reading ``categories.xlsx`` and the JSON folder, its data is set directly.
+Peak memory is measured with tracemalloc, so only Python allocations are counted (not SQLite's).
+"""
+import os
+import logging
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from classes.mirror import RecordMirror
+from classes.parser import JsonParser
+from classes.record import SfRecord
+
+
+def make_data(rows):
+    """Create synthetic categories, JSON metadata and existing Salesforce records."""
+    df_category = pd.DataFrame([{"Name": f"RA {i}", "Category": "Troubleshooting", "Doc": f"https://doc/{i}",
+                                 "Internal": i % 10 == 0} for i in range(rows)])
+    json_metadata = [{"Name": f"RA {i}", "Description": "Description " * 10, "Purpose": "Purpose " * 5,
+                      "Type": "Windows", "Path": f"./out/ra_{i}.json"} for i in range(rows)]
+    existing = [SfRecord(Id=f"a0{i:016d}", Name=f"RA {i}") for i in range(0, rows, 2)]
+    return df_category, json_metadata, existing
+
+
+def make_parser(df_category, json_metadata):
+    """Create a JsonParser holding the synthetic data, as after :code:`parse_json_folder()`."""
+    json_parser = JsonParser.__new__(JsonParser)
+    json_parser.logger = logging.getLogger("waitress.parser.JsonParser")
+    json_parser._df_category = df_category
+    json_parser._json_metadata = json_metadata
+    json_parser._df_json = pd.DataFrame()
+    return json_parser
+
+
+def before(df_category, json_metadata, existing, mirror):
+    df_all = pd.merge(df_category, pd.DataFrame(json_metadata), on="Name", how="left")
+    existing_records = pd.DataFrame.from_records(existing, columns=SfRecord._fields)
+    touched = 0
+    for index, row in df_all.iterrows():
+        if row["Internal"]:
+            continue
+        if row["Name"] in existing_records["Name"].values:
+            touched += len(existing_records.loc[existing_records["Name"] == row["Name"], "Id"].tolist())
+        touched += len(row["Category"]) + len(row["Description"]) + len(row["Doc"]) + len(row["Path"])
+    return touched
+
+
+def after(df_category, json_metadata, existing, mirror):
+    records = make_parser(df_category, json_metadata).records
+    touched = 0
+    for record in records:
+        if record.Internal:
+            continue
+        touched += len(mirror.ids_for_name(record.Name))
+        touched += len(record.Category) + len(record.Description) + len(record.Doc) + len(record.Path)
+    return touched
+
+
+def measure(func, rows, *data):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(*data)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{func.__name__:>7}: {elapsed * 1e6 / rows:9.1f} us/row   peak {peak / 1024 ** 2:8.2f} MiB   ({result})")
+
+
+def main():
+    my_parser = argparse.ArgumentParser(description="RA record model benchmark")
+    my_parser.add_argument("--rows", type=int, default=5000, help="Number of synthetic RAs.")
+    args = my_parser.parse_args()
+
+    df_category, json_metadata, existing = make_data(args.rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mirror = RecordMirror(os.path.join(tmp_dir, "mirror.sqlite"))
+        mirror.replace_all(existing)
+        print(f"{args.rows} RAs, {len(existing)} existing records")
+        measure(before, args.rows, df_category, json_metadata, existing, mirror)
+        measure(after, args.rows, df_category, json_metadata, existing, mirror)
+        mirror.close()
+
+
+if __name__ == "__main__":
+    main()
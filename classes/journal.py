@@ -0,0 +1,170 @@
+import os
+import json
+import logging
+import threading
+
+from datetime import datetime
+
+module_logger = logging.getLogger('waitress.journal')
+
+
+class SyncJournal:
+    """SyncJournal class.
+
+    Append-only journal of the completed synchronisation steps. Every step is written (and flushed to disk) as
+    one JSON line as soon as Salesforce confirms it, so that an interrupted run can be resumed without repeating
+    the API calls that already succeeded.
+
+    Steps:
+        * :code:`delete_all`: the RA Library was emptied (``--from_scratch``)
+        * :code:`delete`: an existing record was deleted (with its id)
+        * :code:`create`: the RA record was created (with its id)
+        * :code:`upload`: the RA JSON file was uploaded (with the ContentVersion id)
+        * :code:`grant`: the view permissions were granted on the file
+        * :code:`run_complete`: the run finished without any failed RA, there is nothing left to resume
+    """
+
+    STEPS = ("delete_all", "delete", "create", "upload", "grant", "run_complete")
+
+    def __init__(self, path_to_journal, resume=False):
+        """SyncJournal constructor.
+
+        :param path_to_journal: the path to the journal file
+        :type path_to_journal: str
+        :param resume: if True replay the existing journal, otherwise start a new one. A journal whose run
+                       completed is not replayed, a new one is started
+        :type resume: bool
+        """
+        self.logger = logging.getLogger("waitress.journal.SyncJournal")
+        self._path_to_journal = path_to_journal
+        self._lock = threading.Lock()
+        self._completed = {}  # RA Name -> {step: id}
+        self._deleted_ids = set()  # ids of the records already deleted
+        self._library_emptied = False
+        self._run_completed = False
+
+        if resume:
+            self._replay()
+            if self._run_completed:
+                self.logger.warning(f"The last run of journal {path_to_journal} completed. Nothing to resume, "
+                                    f"starting a new run.")
+                self._completed, self._deleted_ids, self._library_emptied = {}, set(), False
+                resume = False
+        if not resume:
+            os.makedirs(os.path.dirname(path_to_journal) or ".", exist_ok=True)
+            open(path_to_journal, "w").close()  # Start a new journal
+        self._file = open(path_to_journal, "a", encoding="utf-8")
+
+    def _replay(self):
+        """Load the steps of a previous run.
+
+        Private method that reads the journal line by line. A truncated last line (crash while writing) is ignored
+        and cut from the file, so that the next entries start on a line of their own.
+        :return: None
+        """
+        if not os.path.exists(self._path_to_journal):
+            self.logger.warning(f"No journal found at {self._path_to_journal}. Nothing to resume.")
+            return
+        complete_length = 0  # bytes up to the end of the last complete line
+        with open(self._path_to_journal, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    self.logger.warning(f"Ignoring incomplete journal entry : {line.decode('utf-8', 'replace')}")
+                    break  # the torn last line
+                complete_length += len(line)
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    self.logger.warning(f"Ignoring invalid journal entry : {line.decode('utf-8', 'replace').strip()}")
+                    continue
+                self._apply(entry)
+        if complete_length < os.path.getsize(self._path_to_journal):
+            os.truncate(self._path_to_journal, complete_length)
+        if self._run_completed:
+            return
+        self.logger.info(f"Resuming from journal {self._path_to_journal} : {len(self.finished_ras)} RAs already "
+                         f"loaded, {len(self._completed) - len(self.finished_ras)} partially loaded.")
+
+    def _apply(self, entry):
+        """Update the in-memory state with a journal entry.
+
+        :param entry: a journal entry
+        :type entry: dict
+        :return: None
+        """
+        step = entry.get("step")
+        if step == "delete_all":
+            self._library_emptied = True
+        elif step == "delete":
+            self._deleted_ids.add(entry.get("id"))
+        elif step == "run_complete":
+            self._run_completed = True
+        elif step in self.STEPS:
+            self._completed.setdefault(entry.get("ra"), {})[step] = entry.get("id")
+
+    def record(self, step, ra_name=None, record_id=None):
+        """Append a completed step to the journal.
+
+        :param step: one of :code:`SyncJournal.STEPS`
+        :type step: str
+        :param ra_name: the RA Name the step belongs to
+        :type ra_name: str
+        :param record_id: the Salesforce id returned by the step, if any
+        :type record_id: str
+        :return: None
+        """
+        entry = {"ts": datetime.now().isoformat(), "step": step, "ra": ra_name, "id": record_id}
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())  # The step must survive a crash or a restart of the box
+            self._apply(entry)
+
+    def complete(self):
+        """Mark the run as completed, so that the journal is not replayed by a later :code:`--resume`.
+
+        :return: None
+        """
+        self.record("run_complete")
+
+    def completed_steps(self, ra_name):
+        """Get the completed steps of a RA.
+
+        :param ra_name: the RA Name
+        :type ra_name: str
+        :return: a dictionary with the completed steps as keys and the returned ids as values
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._completed.get(ra_name, {}))
+
+    def is_deleted(self, record_id):
+        """Check if a record was already deleted.
+
+        :param record_id: a Salesforce record id
+        :type record_id: str
+        :rtype: bool
+        """
+        with self._lock:
+            return record_id in self._deleted_ids
+
+    @property
+    def library_emptied(self):
+        """True if the RA Library was already emptied by a previous :code:`--from_scratch` run."""
+        return self._library_emptied
+
+    @property
+    def finished_ras(self):
+        """Get the names of the RAs that went through all the steps.
+
+        :rtype: list
+        """
+        return [ra_name for ra_name, steps in self._completed.items() if "grant" in steps]
+
+    def close(self):
+        """Close the journal file.
+
+        :return: None
+        """
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,172 @@
+import re
+import json
+import mmap
+import logging
+
+module_logger = logging.getLogger('waitress.json_scanner')
+
+_WHITESPACE = b" \t\r\n"
+_STRUCTURE = re.compile(rb'["{}\[\]]')  # the characters that matter when skipping an object or an array
+_SCALAR_END = re.compile(rb'[,}\]\s]')
+try:  # Possessive quantifiers (Python 3.11+) skip a whole string in one match without keeping backtracking state
+    _STRING_BODY = re.compile(rb'[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+except re.error:
+    _STRING_BODY = None
+
+METADATA_KEYS = ("name", "description", "purpose")
+SCRIPT_KEYS = ("scriptWindows", "scriptMacOs")
+
+
+class _Scanner:
+    """Find the boundaries of JSON values in a buffer without decoding them.
+
+    Strings are skipped by searching their closing quote and objects/arrays by counting brackets, so skipping
+    a value doesn't allocate anything whatever its size.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.size = len(buffer)
+
+    def skip_whitespace(self, pos):
+        while pos < self.size and self.buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def char(self, pos):
+        return self.buffer[pos:pos + 1]
+
+    def string_end(self, pos):
+        """Return the position after the string starting at ``pos`` (its opening quote)."""
+        if _STRING_BODY:
+            match = _STRING_BODY.match(self.buffer, pos + 1)
+            if not match:
+                raise ValueError(f"Unterminated string at position {pos}")
+            return match.end()
+        end = pos
+        while True:
+            end = self.buffer.find(b'"', end + 1)
+            if end == -1:
+                raise ValueError(f"Unterminated string at position {pos}")
+            backslash = end - 1
+            while self.buffer[backslash] == 0x5C:  # count the backslashes before the quote
+                backslash -= 1
+            if (end - 1 - backslash) % 2 == 0:  # an escaped backslash, not an escaped quote
+                return end + 1
+
+    def value_end(self, pos):
+        """Return the position after the value starting at ``pos``."""
+        char = self.char(pos)
+        if char == b'"':
+            return self.string_end(pos)
+        if char in (b"{", b"["):
+            depth = 0
+            while True:
+                match = _STRUCTURE.search(self.buffer, pos)
+                if not match:
+                    raise ValueError(f"Unterminated object or array at position {pos}")
+                pos = match.start()
+                if match.group() == b'"':
+                    pos = self.string_end(pos)
+                    continue
+                depth += 1 if match.group() in (b"{", b"[") else -1
+                pos += 1
+                if depth == 0:
+                    return pos
+        match = _SCALAR_END.search(self.buffer, pos)
+        return match.start() if match else self.size
+
+    def iter_object(self, pos):
+        """Yield the ``(key, value_start)`` of each member of the object starting at ``pos``.
+
+        The end of a value is only searched when the next member is requested, so a caller that stops early never
+        scans the last value it looked at.
+        """
+        pos = self.skip_whitespace(pos)
+        if self.char(pos) != b"{":
+            raise ValueError(f"Expected an object at position {pos}")
+        pos = self.skip_whitespace(pos + 1)
+        if self.char(pos) == b"}":
+            return
+        while True:
+            pos = self.skip_whitespace(pos)
+            key_end = self.string_end(pos)
+            key = json.loads(self.buffer[pos:key_end])
+            pos = self.skip_whitespace(key_end)
+            if self.char(pos) != b":":
+                raise ValueError(f"Expected ':' at position {pos}")
+            value_start = self.skip_whitespace(pos + 1)
+            yield key, value_start
+            pos = self.skip_whitespace(self.value_end(value_start))
+            if self.char(pos) == b",":
+                pos += 1
+            elif self.char(pos) == b"}":
+                return
+            else:
+                raise ValueError(f"Expected ',' or '}}' at position {pos}")
+
+    def decode(self, start):
+        """Decode the value starting at ``start``."""
+        return json.loads(self.buffer[start:self.value_end(start)])
+
+    def is_null(self, start):
+        return self.buffer[start:start + 4] == b"null"
+
+    def is_truthy(self, start):
+        """Return the truthiness of a value (as ``bool()`` of the decoded value) without scanning it."""
+        char = self.char(start)
+        if char == b'"':
+            return self.char(start + 1) != b'"'  # not ""
+        if char in (b"{", b"["):
+            return self.char(self.skip_whitespace(start + 1)) not in (b"}", b"]")  # not {} or []
+        return bool(self.decode(start))
+
+
+def extract_ra_metadata(file_path):
+    """Extract the metadata of a RA JSON file without loading the scripts.
+
+    The file is memory-mapped and scanned: only the ``name``, ``description`` and ``purpose`` values are decoded.
+    For ``scriptInfo``, only the presence of the Windows and macOS scripts is checked. The scan stops as soon as
+    all of them are known, so at most the scripts placed before the last needed key are skipped over (without
+    being copied), and memory depends on the size of the metadata, not of the scripts. As the rest of the file
+    is not read, a key repeated after that point or a syntax error at the end of the file go unnoticed.
+
+    :param file_path: The path of the JSON RA
+    :type file_path: str
+    :return: a dictionary shaped like the RA JSON, e.g. ``{"name": ..., "description": ..., "purpose": ...,
+             "scriptInfo": {"scriptWindows": True, "scriptMacOs": None}}``. A script is None when it is missing or
+             null, otherwise the truthiness of its value
+    :rtype: dict
+    :raises ValueError: if the file is empty or is not a JSON object
+    """
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            scanner = _Scanner(buffer)
+            start = 3 if buffer[:3] == b"\xef\xbb\xbf" else 0  # UTF-8 BOM
+            metadata = {}
+            for key, value_start in scanner.iter_object(start):
+                if key in METADATA_KEYS:
+                    metadata[key] = scanner.decode(value_start)
+                elif key == "scriptInfo":
+                    metadata[key] = None if scanner.is_null(value_start) else _read_script_info(scanner, value_start)
+                if all(needed_key in metadata for needed_key in METADATA_KEYS + ("scriptInfo",)):
+                    break  # everything is known, the rest of the file is not scanned
+            return metadata
+
+
+def _read_script_info(scanner, start):
+    """Check which scripts the ``scriptInfo`` object starting at ``start`` contains.
+
+    :return: a dictionary with the truthiness of the scripts (None if null), and True for the other keys (only
+             their presence matters)
+    :rtype: dict
+    """
+    script_info = {}
+    for key, value_start in scanner.iter_object(start):
+        if key in SCRIPT_KEYS:
+            script_info[key] = None if scanner.is_null(value_start) else scanner.is_truthy(value_start)
+        else:
+            script_info[key] = True
+        if all(script_key in script_info for script_key in SCRIPT_KEYS):
+            break
+    return script_info
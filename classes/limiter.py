@@ -0,0 +1,100 @@
+import time
+import logging
+import threading
+
+module_logger = logging.getLogger('waitress.limiter')
+
+
+class AdaptiveLimiter:
+    """AdaptiveLimiter class.
+
+    Limits the number of HTTP requests in flight with an AIMD (additive increase, multiplicative decrease) rule:
+        * every successful request with a stable latency raises the limit by ``1 / limit``, i.e. by one request
+          per round of ``limit`` requests. Requests sent before the last decrease don't raise it
+        * a throttled request (429, 503, row lock or concurrent request limit errors) or a latency spike (more
+          than ``latency_tolerance`` times the average latency of the same kind of request) multiplies the limit
+          by ``backoff``, at most once per average latency so that the requests of the same round don't cut it
+          several times
+        * a failed request (any other error) leaves the limit and the averages unchanged
+
+    The average latency is kept per kind of request (e.g. per endpoint), so that a slow file upload is compared
+    to the previous uploads and not to the small record requests.
+    """
+
+    OK = "ok"
+    THROTTLED = "throttled"
+    FAILED = "failed"
+
+    def __init__(self, min_limit=1, max_limit=16, initial_limit=4, backoff=0.5, latency_tolerance=2.0, name=None):
+        """AdaptiveLimiter constructor.
+
+        :param min_limit: the minimum number of requests in flight
+        :param max_limit: the maximum number of requests in flight
+        :param initial_limit: the number of requests in flight to start with
+        :param backoff: the factor applied to the limit on a throttled request or a latency spike
+        :param latency_tolerance: the latency spike threshold, as a multiple of the average latency
+        :param name: a name for the logs (e.g. the env of the org)
+        """
+        self.logger = logging.getLogger(f"waitress.limiter.AdaptiveLimiter.{name}")
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._backoff = backoff
+        self._latency_tolerance = latency_tolerance
+        self._in_flight = 0
+        self._average_latency = {}  # kind of request -> moving average of the latency of its successful requests
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """The current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def acquire(self):
+        """Wait until a request can be sent.
+
+        :return: None
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency, outcome=OK, kind=None):
+        """Release the slot of a finished request and adapt the limit.
+
+        :param latency: the latency of the request in seconds
+        :type latency: float
+        :param outcome: :code:`OK`, :code:`THROTTLED` if Salesforce rejected the request because of its concurrency
+                        limits, or :code:`FAILED` for any other error
+        :type outcome: str
+        :param kind: the kind of request, the latency is compared to the average of the same kind
+        :type kind: str
+        :return: None
+        """
+        with self._condition:
+            self._in_flight -= 1
+            previous_limit = int(self._limit)
+            average_latency = self._average_latency.get(kind)
+            throttled = outcome == self.THROTTLED
+            spike = outcome == self.OK and average_latency is not None \
+                and latency > average_latency * self._latency_tolerance
+            if throttled or spike:
+                now = time.monotonic()
+                if now - self._last_decrease > (average_latency or 1.0):
+                    self._limit = max(self._min_limit, self._limit * self._backoff)
+                    self._last_decrease = now
+            elif outcome == self.OK and time.monotonic() - latency > self._last_decrease:  # sent with this limit
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            if outcome == self.OK:
+                self._average_latency[kind] = latency if average_latency is None \
+                    else 0.9 * average_latency + 0.1 * latency
+            if int(self._limit) > previous_limit:
+                self.logger.debug("Concurrency raised to %d (%s latency %.3fs, average %.3fs)",
+                                  int(self._limit), kind, latency, self._average_latency[kind])
+            elif int(self._limit) < previous_limit:
+                self.logger.info("Concurrency cut to %d (%s latency %.3fs, average %.3fs%s)",
+                                 int(self._limit), kind, latency, average_latency or 0.0,
+                                 ", throttled" if throttled else ", latency spike")
+            self._condition.notify_all()
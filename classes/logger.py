@@ -1,12 +1,61 @@
+import copy
+import json
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """Format the log records as one JSON object per line.
+
+    The structured fields passed with ``extra`` (RA name, step, latency, status) are added to the JSON object
+    when they are present on the record.
+    """
+
+    STRUCTURED_FIELDS = ("ra", "step", "latency", "status")
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in self.STRUCTURED_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # already formatted by KeepExcQueueHandler
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class KeepExcQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback apart from the message.
+
+    The default :code:`prepare()` merges the traceback into ``msg``; here it is formatted into ``exc_text``,
+    which the text formatter appends to the line and :code:`JsonLinesFormatter` writes to its own field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None  # tracebacks hold frames, they are not kept on the queue
+        return record
+
+
 class Logger:
 
     def __init__(self, level):
         self.logger = logging.getLogger("waitress")
         self.logger.setLevel(level)
+        self._listener = None
 
     @staticmethod
     def get_current_datetime():
@@ -14,17 +63,42 @@ class Logger:
         date_now = now.strftime("%m-%d-%Y-%H-%M-%S")
         return date_now
 
-    def set_handler(self, file=True):
+    def set_handler(self, file=True, use_queue=True, structured=False):
+        """Attach the log handler.
+
+        With ``use_queue`` the logger only puts the records on a queue, and a background listener thread writes
+        them to the file, so the sync threads never wait on the file handler lock.
+
+        :param file: if True log to a file in ./logs
+        :param use_queue: if True write the logs from a background listener thread
+        :param structured: if True write JSON lines (.jsonl) instead of plain text
+        :return: None
+        """
         if file:
-            f_handler = logging.FileHandler(f'./logs/logs_{self.get_current_datetime()}.log')
-            f_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            extension = "jsonl" if structured else "log"
+            f_handler = logging.FileHandler(f'./logs/logs_{self.get_current_datetime()}.{extension}')
+            if structured:
+                f_format = JsonLinesFormatter()
+            else:
+                f_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             f_handler.setFormatter(f_format)
-            self.logger.addHandler(f_handler)
+            if use_queue:
+                log_queue = queue.SimpleQueue()
+                self._listener = logging.handlers.QueueListener(log_queue, f_handler, respect_handler_level=True)
+                self._listener.start()
+                atexit.register(self.stop)  # Flush the queue even when Waitress exits early
+                self.logger.addHandler(KeepExcQueueHandler(log_queue))
+            else:
+                self.logger.addHandler(f_handler)
 
     def set_level(self, level):
-        self.logger.setLevel(level=logging.DEBUG)
-
-
-
+        self.logger.setLevel(level=level)
 
+    def stop(self):
+        """Stop the background listener after it has written all the queued records.
 
+        :return: None
+        """
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
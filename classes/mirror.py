@@ -0,0 +1,131 @@
+import os
+import logging
+import sqlite3
+import threading
+
+from classes.record import SfRecord
+
+module_logger = logging.getLogger('waitress.mirror')
+
+
+class RecordMirror:
+    """RecordMirror class.
+
+    Local SQLite copy of the RA records of one Salesforce org, indexed on Id (primary key) and Name. It also keeps
+    the sync state used for the incremental refreshes:
+        * :code:`watermark`: the most recent ``LastModifiedDate`` of the mirrored records
+        * :code:`deleted_checkpoint`: the date up to which the deleted records were fetched
+    """
+
+    def __init__(self, path_to_mirror):
+        """RecordMirror constructor.
+
+        :param path_to_mirror: the path to the SQLite database, created if it doesn't exist
+        :type path_to_mirror: str
+        """
+        self.logger = logging.getLogger("waitress.mirror.RecordMirror")
+        os.makedirs(os.path.dirname(path_to_mirror) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path_to_mirror, check_same_thread=False)  # shared by the sync threads
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS ra_records (Id TEXT PRIMARY KEY, Name TEXT, "
+                                     "LastModifiedDate TEXT, Description TEXT, Category TEXT, OS TEXT, Details TEXT)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS ra_records_name ON ra_records (Name)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _get_state(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def watermark(self):
+        """The most recent LastModifiedDate of the mirrored records, None before the first full load."""
+        return self._get_state("watermark")
+
+    @property
+    def deleted_checkpoint(self):
+        """The date up to which the deleted records were fetched, None before the first full load."""
+        return self._get_state("deleted_checkpoint")
+
+    def set_checkpoints(self, watermark, deleted_checkpoint):
+        """Store the sync state after a refresh.
+
+        :param watermark: the most recent LastModifiedDate of the mirrored records
+        :param deleted_checkpoint: the date up to which the deleted records were fetched
+        :return: None
+        """
+        if watermark:
+            self._set_state("watermark", watermark)
+        if deleted_checkpoint:
+            self._set_state("deleted_checkpoint", deleted_checkpoint)
+
+    def replace_all(self, records):
+        """Replace the mirrored records (full load).
+
+        :param records: a list of :code:`classes.record.SfRecord`
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM ra_records")
+            self._connection.executemany("INSERT OR REPLACE INTO ra_records VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+
+    def upsert(self, records):
+        """Insert or update records.
+
+        :param records: a list of :code:`classes.record.SfRecord`
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO ra_records VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+
+    def delete(self, record_ids):
+        """Delete records.
+
+        :param record_ids: the IDs of the records to delete
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM ra_records WHERE Id = ?",
+                                         [(record_id,) for record_id in record_ids])
+
+    def all_records(self):
+        """Get all the mirrored records.
+
+        :return: a list of :code:`classes.record.SfRecord`
+        :rtype: list
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT * FROM ra_records ORDER BY Name").fetchall()
+        return [SfRecord(*row) for row in rows]
+
+    def ids_for_name(self, name):
+        """Get the IDs of the records of a RA.
+
+        :param name: the RA Name
+        :return: a list of record IDs
+        :rtype: list
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT Id FROM ra_records WHERE Name = ?", (name,)).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self):
+        """Get the number of mirrored records.
+
+        :rtype: int
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM ra_records").fetchone()[0]
+
+    def close(self):
+        """Close the database.
+
+        :return: None
+        """
+        with self._lock:
+            self._connection.close()
@@ -1,10 +1,12 @@
 import os
-import json
 import logging
 import pandas as pd
 
 from datetime import datetime
 
+from classes.record import RaRecord
+from classes.json_scanner import extract_ra_metadata
+
 module_logger = logging.getLogger('waitress.parser')
 
 
@@ -22,6 +24,7 @@ class JsonParser:
             * logger instantiation
             * call to :code:`_load_config()`
             * call to :code:`_load_data_categories()`
+            * creation of :code:`_json_metadata`
             * creation of :code:`_df_json`
             * creation of :code:`_df_all`
             * creation of :code:`list_ra_names`
@@ -34,7 +37,8 @@ class JsonParser:
         self.logger.info(f"Initiating the JSON Parser Object - Will parse JSON files in {self._path_to_json}")
         self._df_category = self._load_data_categories()  # Load RAs categories from Excel file
 
-        self._df_json = pd.DataFrame()  # Df to store data from JSON files
+        self._json_metadata = []  # Metadata extracted from the JSON files, one dictionary per file
+        self._df_json = pd.DataFrame()  # Df to store data from JSON files, built on demand from _json_metadata
         self._df_all = pd.DataFrame()  # Df to merge JSON file data with Category Excel file
 
         self.list_ra_names = ["Name"]  # List to store the Names of the JSON RAs in the out/ folder
@@ -125,7 +129,8 @@ class JsonParser:
             exit(1)
         else:
             if ra_list:
-                self._df_json = pd.DataFrame(ra_list)  # create a dataframe with the data gathered
+                self._json_metadata = ra_list  # the dataframe is only built if needed (see df_json)
+                self._df_json = pd.DataFrame()
             else:
                 self.logger.warning("No JSON files found in the specified location. Waitress will exit.")
                 exit(0)
@@ -137,8 +142,8 @@ class JsonParser:
         :return: a dataframe with RA Names
         :rtype: pandas.DataFrame
         """
-        if not self._df_json.empty:
-            return self._df_json.loc[:, ["Name"]]
+        if not self.df_json.empty:
+            return self.df_json.loc[:, ["Name"]]
 
     def get_delta_dataframe(self):
         """Public method that returns the delta
@@ -156,8 +161,12 @@ class JsonParser:
         """
         Returns the df with RA JSON or an empty dataframe
 
+        The dataframe is created from the parsed metadata the first time it is requested.
+
         :return: self._df_json or an empty df
         """
+        if self._df_json.empty and self._json_metadata:
+            self._df_json = pd.DataFrame(self._json_metadata)
         return self._df_json
 
     @property
@@ -199,25 +208,57 @@ class JsonParser:
                 self.logger.info("Merge between Metadata and JSON data successful.")
                 return self._df_all
 
+    @property
+    def records(self):
+        """Create the full list of RA records.
+
+        Same left join as :code:`df_all` (all the RAs of **categories.xlsx**, with the metadata of their JSON
+        file when there is one), but produces compact :code:`RaRecord` tuples instead of a dataframe. This is
+        what the sync loops over.
+
+        :returns: a list of :code:`classes.record.RaRecord`
+        :rtype: list
+        """
+        if self.df_category.empty or not self._json_metadata:
+            self.logger.error("Cannot retrieve full RA list. Check if RA metadata coming from JSON files "
+                              "and from Excel Category file are not empty. Waitress will exit.")
+            exit(0)
+        json_by_name = {}
+        for json_metadata in self._json_metadata:
+            json_by_name.setdefault(json_metadata["Name"], []).append(json_metadata)
+        records = []
+        columns = ["Name", "Category", "Doc", "Internal"]
+        for name, category, doc, internal in self.df_category.loc[:, columns].itertuples(index=False, name=None):
+            for json_metadata in json_by_name.get(name, [{}]):  # One record per match, like the merge
+                records.append(RaRecord(Name=name,
+                                        Category=category,
+                                        Doc=doc,
+                                        Internal=bool(internal),
+                                        Description=json_metadata.get("Description"),
+                                        Purpose=json_metadata.get("Purpose"),
+                                        Type=json_metadata.get("Type"),
+                                        Path=json_metadata.get("Path")))
+        return records
+
     def _read_json_file(self, file_path):
         """Open and extract RA metadata from a RA JSON file.
 
-        Open the JSON file and extract the Name, Description, Purpose, Type, Path
+        Open the JSON file and extract the Name, Description, Purpose, Type, Path. The file is scanned with
+        :code:`extract_ra_metadata()`, so the embedded scripts are never loaded in memory.
 
         :param file_path: The path of the JSON RA
         :return: Dictionary
         """
         if os.path.exists(file_path):
             try:
-                with open(file_path) as json_file:  # Open the JSON file and extract the data
-                    data_json = json.load(json_file)
-                    local_dict = {  # We use get() so if value doesn't exist None is returned
-                        "Name": data_json.get("name"),
-                        "Description": data_json.get("description"),
-                        "Purpose": data_json.get("purpose"),
-                        "Type": self._get_ra_type(data_json),
-                        "Path": file_path
-                    }
+                data_json = extract_ra_metadata(file_path)  # Scan the JSON file and extract the metadata
+                local_dict = {  # We use get() so if value doesn't exist None is returned
+                    "Name": data_json.get("name"),
+                    "Description": data_json.get("description"),
+                    "Purpose": data_json.get("purpose"),
+                    "Type": self._get_ra_type(data_json),
+                    "Path": file_path
+                }
             except FileNotFoundError as fileErr:
                 self.logger.exception(fileErr)
                 return
@@ -228,7 +269,7 @@ class JsonParser:
                 self.logger.exception(err)
                 return
             else:
-                self.logger.debug(f"{data_json['name']} JSON file parsed with success.")
+                self.logger.debug("%s JSON file parsed with success.", data_json['name'])
                 return local_dict
         else:
             self.logger.error(f"{file_path} doesn't exist.")
@@ -243,7 +284,7 @@ class JsonParser:
             * Combined
             * ""
 
-        :param json_obj:
+        :param json_obj: the metadata of the RA JSON (see :code:`extract_ra_metadata()`)
         :return: a string with RA type
         """
         script_info = json_obj.get("scriptInfo")
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from typing import NamedTuple, Optional
+
+
+class RaRecord(NamedTuple):
+    """A Remote Action to publish, from ``categories.xlsx`` joined with its JSON file.
+
+    Tuple-backed, so a record costs one small tuple instead of a pandas Series. The fields keep the column
+    names of :code:`JsonParser.df_all`. The JSON fields are None when the RA has no JSON file.
+    """
+    Name: str
+    Category: Optional[str]
+    Doc: Optional[str]
+    Internal: bool
+    Description: Optional[str] = None
+    Purpose: Optional[str] = None
+    Type: Optional[str] = None
+    Path: Optional[str] = None
+
+
+class SfRecord(NamedTuple):
+    """An existing RA record queried from Salesforce."""
+    Id: str
+    Name: str
+    LastModifiedDate: Optional[str] = None
+    Description: Optional[str] = None
+    Category: Optional[str] = None
+    OS: Optional[str] = None
+    Details: Optional[str] = None
+
+
+def records_to_dataframe(records, record_type):
+    """Convert a list of records to a dataframe.
+
+    Only used at the Excel edges (exports), the sync itself works on the records.
+
+    :param records: a list of :code:`RaRecord` or :code:`SfRecord`
+    :type records: list
+    :param record_type: the record class, used for the column names when the list is empty
+    :type record_type: type
+    :return: a dataframe with one column per record field
+    :rtype: pandas.DataFrame
+    """
+    return pd.DataFrame.from_records(records, columns=record_type._fields)
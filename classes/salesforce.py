@@ -1,20 +1,47 @@
-import pandas as pd
-import numpy as np
-
+import io
+import re
+import csv
+import gzip
 import json
 import base64
 import os
 import logging
-import math
+import time
+import threading
+
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote_plus, urlparse
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from decouple import config
 import requests
 from requests.exceptions import HTTPError
 
+from classes.journal import SyncJournal
+from classes.record import SfRecord
+from classes.limiter import AdaptiveLimiter
+from classes.mirror import RecordMirror
+
 
 module_logger = logging.getLogger('waitress.salesforce')
 
+THROTTLING_STATUS_CODES = (429, 503)
+# REQUEST_LIMIT_EXCEEDED alone is the daily API quota of the org, only its concurrent request variants are throttling
+THROTTLING_ERROR_CODES = ("UNABLE_TO_LOCK_ROW", "ConcurrentPerOrgLongTxn", "ConcurrentRequests")
+SALESFORCE_ID = re.compile(r"^(?=.*\d)[a-zA-Z0-9]{15}(?:[a-zA-Z0-9]{3})?$")
+
+
+def _parse_sf_datetime(value):
+    """Parse a Salesforce datetime (e.g. ``2022-08-05T10:00:00.000+0000``) or an ISO 8601 datetime.
+
+    :rtype: datetime.datetime
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        return datetime.fromisoformat(value)
+
 
 class Salesforce:
     """A class provides a utility interface to manage Salesforce API. It allows to manage and load Remote Action
@@ -29,15 +56,28 @@ class Salesforce:
         :param config_file: a path to a JSON config file
         :rtype: str
         """
-        self.logger = logging.getLogger("waitress.salesforce.Salesforce")
+        self._env = config_file.get("env")  # Used to tell orgs apart when several are synced in parallel
+        self.logger = logging.getLogger(f"waitress.salesforce.Salesforce.{self._env}")
         self.logger.debug("Initiating Salesforce API object")
         self._load_config(config_file)  # Load configuration
         self._bearer_token = None
+        self._wire_stats = {"sent": 0, "sent_uncompressed": 0, "received": 0, "received_uncompressed": 0,
+                            "received_unsized": 0}
+        self._wire_stats_lock = threading.Lock()
         self._header = None
+        self._limiter = AdaptiveLimiter(min_limit=1,
+                                        max_limit=self._max_concurrency,
+                                        initial_limit=self._initial_concurrency,
+                                        name=self._env)  # Limits the requests in flight
 
         self._get_bearer_token()  # We update the self._bearer_token with a new token
         self._create_header()  # We update the self._header with token and content type
-        self._existing_records = self._get_all_records()  # get all existing records in Salesforce
+        self._mirror = RecordMirror(self._path_to_mirror)  # local copy of the existing records in Salesforce
+        try:
+            self._refresh_mirror()
+        except SystemExit:  # the object is not returned to the caller, so the mirror is closed here
+            self._mirror.close()
+            raise
 
     def _load_config(self, config_file):
         """Load configuration for JSON file.
@@ -60,6 +100,29 @@ class Salesforce:
         self._client_secret = config_file.get("client_secret")
         self._username = config_file.get("username")
         self._password = config_file.get("password")
+        self._path_to_journal = config_file.get("path_to_journal", f"./logs/journal_{self._env}.jsonl")
+        self._url_describe = config_file.get("url_describe")
+        self._path_to_describe_cache = config_file.get("path_to_describe_cache", f"./cache/describe_{self._env}.json")
+        self._describe_cache_ttl = config_file.get("describe_cache_ttl", 86400)  # seconds
+        self._url_bulk_ingest = config_file.get("url_bulk_ingest")
+        self._ra_object_name = config_file.get("ra_object_name")
+        self._bulk_poll_interval = config_file.get("bulk_poll_interval", 5)  # seconds
+        self._bulk_timeout = config_file.get("bulk_timeout", 3600)  # seconds
+        self._gzip_threshold = config_file.get("gzip_threshold", 1024)  # bytes, None to never compress requests
+        self._max_concurrency = config_file.get("max_concurrency", 16)  # max requests in flight
+        self._initial_concurrency = config_file.get("initial_concurrency", 4)
+        self._max_retries = config_file.get("max_retries", 3)  # retries of a throttled request
+        self._url_query = config_file.get("url_query")  # the query endpoint, e.g. .../query/?q=
+        self._path_to_mirror = config_file.get("path_to_mirror", f"./cache/mirror_{self._env}.sqlite")
+
+    @property
+    def env(self):
+        """Get the environment name.
+
+        :returns: The ``env`` value of the configuration file (e.g. dev, staging, prod)
+        :rtype: str
+        """
+        return self._env
 
     @staticmethod
     def encode_to_b64_string(string):
@@ -117,40 +180,148 @@ class Salesforce:
             self.logger.debug("Bearer token retrieved successfully.")
             self._bearer_token = bearer_token
 
-    def _run_http_request(self, request_type, url, payload=None):
+    def _run_http_request(self, request_type, url, payload=None, headers=None):
         """Run an HTTP request.
 
-        Private method that leverages the ``request`` package in order to run HTTP requests.
+        Private method that leverages the ``request`` package in order to run HTTP requests. Payloads larger than
+        ``gzip_threshold`` bytes are sent gzip compressed, and the bytes sent and received are added to
+        :code:`wire_stats`.
+
+        Every request waits for a slot of the adaptive limiter, which adapts the number of requests in flight to
+        the latency (compared per endpoint, see :code:`_request_kind()`) and to the throttling errors. A throttled
+        request is retried (``max_retries``) with an exponential backoff. Other errors, including the daily API
+        quota, are not retried.
 
         :param request_type: The type of request e.g. POST, GET, DELETE
         :param url: the endpoint URL
         :param payload: Optional payload
+        :param headers: Optional headers, added to (or replacing) the default header
         :returns: An http response
         :rtype: requests.Response
         """
-        try:
-            response = requests.request(request_type, url, headers=self._header, data=payload)
-            response.raise_for_status()
-        except HTTPError as http_err:
-            self.logger.exception(http_err)
-        except Exception as err:
-            self.logger.exception(err)
-        else:
-            self.logger.debug(f"{request_type} request successfully executed.")
-            return response
+        request_headers = {**self._header, **headers} if headers else self._header
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        uncompressed_length = len(payload) if payload else 0
+        if payload and self._gzip_threshold is not None and len(payload) > self._gzip_threshold:
+            payload = gzip.compress(payload)
+            request_headers = {**request_headers, "Content-Encoding": "gzip"}
+
+        kind = self._request_kind(request_type, url)
+        for attempt in range(self._max_retries + 1):
+            outcome = AdaptiveLimiter.FAILED
+            self._limiter.acquire()
+            started = time.perf_counter()
+            try:
+                self._count_sent_bytes(uncompressed_length, len(payload) if payload else 0)
+                response = requests.request(request_type, url, headers=request_headers, data=payload)
+                self._count_received_bytes(response)
+                response.raise_for_status()
+            except HTTPError as http_err:
+                if self._is_throttled(http_err.response):
+                    outcome = AdaptiveLimiter.THROTTLED
+                if outcome == AdaptiveLimiter.FAILED or attempt == self._max_retries:
+                    self.logger.exception(http_err)
+                    return
+            except Exception as err:
+                self.logger.exception(err)
+                return
+            else:
+                outcome = AdaptiveLimiter.OK
+                self.logger.debug("%s request successfully executed.", request_type)
+                return response
+            finally:
+                self._limiter.release(time.perf_counter() - started, outcome, kind)
+            self.logger.warning("%s request throttled by Salesforce, retrying in %d seconds.",
+                                request_type, 2 ** attempt)
+            time.sleep(2 ** attempt)
+
+    @staticmethod
+    def _request_kind(request_type, url):
+        """Get the kind of a request, used to compare its latency with the requests of the same endpoint.
+
+        :param request_type: The type of request e.g. POST, GET, DELETE
+        :param url: the endpoint URL
+        :return: the request type and the URL path, with the record IDs replaced, e.g. ``DELETE /.../{id}``. Only
+                 the request type if the URL is not a string (missing from the configuration)
+        :rtype: str
+        """
+        if not isinstance(url, str):
+            return request_type
+        path = "/".join("{id}" if SALESFORCE_ID.match(segment) else segment
+                        for segment in urlparse(url).path.split("/"))
+        return f"{request_type} {path}"
+
+    @staticmethod
+    def _is_throttled(response):
+        """Check if a request failed because of the Salesforce concurrency limits.
+
+        :param response: the http response of the failed request
+        :type response: requests.Response
+        :return: True for 429 and 503 responses and for row lock or concurrent request limit errors. False for
+                 the daily API quota (``REQUEST_LIMIT_EXCEEDED`` without a concurrent limit), retrying can't help
+        :rtype: bool
+        """
+        if response is None:
+            return False
+        if response.status_code in THROTTLING_STATUS_CODES:
+            return True
+        return any(error_code in response.text for error_code in THROTTLING_ERROR_CODES)
+
+    def _count_sent_bytes(self, uncompressed_length, length):
+        """Add the size of a request payload to :code:`wire_stats`.
+
+        :param uncompressed_length: the size of the payload before compression
+        :param length: the size of the payload sent
+        :return: None
+        """
+        with self._wire_stats_lock:
+            self._wire_stats["sent_uncompressed"] += uncompressed_length
+            self._wire_stats["sent"] += length
+
+    def _count_received_bytes(self, response):
+        """Add the size of a response to :code:`wire_stats`.
+
+        The wire size is the ``Content-Length`` of the response (the compressed size if the response was gzip
+        encoded), the uncompressed size is the size of the decoded content. Chunked responses have no
+        ``Content-Length``: their wire size is unknown, they are only counted in ``received_unsized``.
+
+        :param response: an http response
+        :type response: requests.Response
+        :return: None
+        """
+        wire_length = response.headers.get("Content-Length")
+        with self._wire_stats_lock:
+            if wire_length is None or not wire_length.isdigit():
+                self._wire_stats["received_unsized"] += 1
+                return
+            self._wire_stats["received_uncompressed"] += len(response.content)
+            self._wire_stats["received"] += int(wire_length)
+
+    @property
+    def wire_stats(self):
+        """Get the number of bytes sent and received.
+
+        :returns: a dictionary with the bytes ``sent`` and ``received`` on the wire, their ``*_uncompressed``
+                  sizes, and the number of responses whose wire size is unknown (``received_unsized``)
+        :rtype: dict
+        """
+        with self._wire_stats_lock:
+            return dict(self._wire_stats)
 
     def _get_all_records(self):
         """Get all the existing RA records from Salesforce.
 
-        Private  method uses that retrieve all the existing records from Salesforce.
+        Private  method uses that retrieve all the existing records from Salesforce. Only used to load the
+        mirror when ``url_query`` is not configured (see :code:`_refresh_mirror()`).
 
         Steps:
             * Query all the existing records via GET and retrieve a JSON with all object and their ID
             * If the record database is not empty, get the record ID for all the records
             * For each record, create a URL with the ID and query the endpoint to get the record details
-            * Store the results in a dataframe
-        :return: a pandas dataframe with all existing RA records. Otherwise, an empty dataframe
-        :rtype: pandas.DataFrame
+            * Store the results in a list of records
+        :return: a list with all existing RA records. Otherwise, an empty list
+        :rtype: list
         """
         all_records_response = self._run_http_request("GET", self._url_query_all)  # Query all existing records
         if all_records_response:  # if request is successful
@@ -162,40 +333,221 @@ class Salesforce:
                     record_url = self._url_to_record + record["Id"]  # Create a URL to query a record for a specific ID
                     response_record = self._run_http_request("GET", record_url)  # Query data for a specific record
                     if not response_record:  # If we cannot get the record data, go to next record
-                        self.logger.error(f"Cannot get record for {record['ID']}")
+                        self.logger.error(f"Cannot get record for {record['Id']}")
                         continue
                     record_json = response_record.json()  # if successful, we parse the response
-                    local_dict = {  # Create a dictionary with returned data
-                        "Id": record_json.get("Id"),
-                        "Name": record_json.get("Name"),
-                        "LastModifiedDate": record_json.get("LastModifiedDate"),
-                        "Description": record_json.get("Description__c"),
-                        "Category": record_json.get("Category__c"),
-                        "OS": record_json.get("OS__c"),
-                        "Details": record_json.get("Details_URL__c")
-                    }
-                    list_records.append(local_dict)  # Append the record to the list
-                return pd.DataFrame(list_records)  # Return the created dataframe containing all records
+                    list_records.append(SfRecord(  # Create a record with returned data
+                        Id=record_json.get("Id"),
+                        Name=record_json.get("Name"),
+                        LastModifiedDate=record_json.get("LastModifiedDate"),
+                        Description=record_json.get("Description__c"),
+                        Category=record_json.get("Category__c"),
+                        OS=record_json.get("OS__c"),
+                        Details=record_json.get("Details_URL__c")
+                    ))
+                return list_records  # Return the list containing all records
             else:
                 self.logger.info("No records found. RA Library is empty.")
-                return pd.DataFrame()  # We return an empty dataframe
+                return []  # We return an empty list
         else:
             self.logger.error("Couldn't query the Salesforce API to get the full records list. Program will close.")
             exit(1)
 
+    def _query_records(self, where_clause=""):
+        """Query the RA records with a SOQL query.
+
+        Private method that gets the fields of the records directly from the query (no request per record),
+        following ``nextRecordsUrl`` until all the pages are read.
+
+        :param where_clause: an optional SOQL WHERE clause
+        :type where_clause: str
+        :return: a list of :code:`classes.record.SfRecord`, None if a query failed
+        :rtype: list or None
+        """
+        soql = f"SELECT Id, Name, LastModifiedDate, Description__c, Category__c, OS__c, Details_URL__c " \
+               f"FROM {self._ra_object_name} {where_clause}".strip()
+        url = self._url_query + quote_plus(soql)
+        instance_url = "{0.scheme}://{0.netloc}".format(urlparse(self._url_query))
+        records = []
+        while url:
+            query_response = self._run_http_request("GET", url)
+            if not query_response:
+                return None
+            query_json = query_response.json()
+            records.extend(SfRecord(Id=record_json.get("Id"),
+                                    Name=record_json.get("Name"),
+                                    LastModifiedDate=record_json.get("LastModifiedDate"),
+                                    Description=record_json.get("Description__c"),
+                                    Category=record_json.get("Category__c"),
+                                    OS=record_json.get("OS__c"),
+                                    Details=record_json.get("Details_URL__c"))
+                           for record_json in query_json["records"])
+            next_records_url = query_json.get("nextRecordsUrl")
+            url = instance_url + next_records_url if next_records_url else None
+        return records
+
+    def _get_deleted_record_ids(self, start):
+        """Get the IDs of the RA records deleted since a date.
+
+        :param start: the date from which the deleted records are fetched (within the last 30 days)
+        :type start: datetime.datetime
+        :return: a tuple with the deleted IDs and the date up to which Salesforce covered the deletions, None if
+                 the request failed or the date is older than the deleted records Salesforce keeps
+        :rtype: tuple or None
+        """
+        end = datetime.now(timezone.utc)
+        if end - start < timedelta(minutes=1):  # Salesforce rejects shorter ranges, the next refresh will cover it
+            return [], start.isoformat()
+        deleted_url = f"{self._url_to_record}deleted/?start={quote_plus(start.isoformat(timespec='seconds'))}" \
+                      f"&end={quote_plus(end.isoformat(timespec='seconds'))}"
+        deleted_response = self._run_http_request("GET", deleted_url)
+        if not deleted_response:
+            return None
+        deleted_json = deleted_response.json()
+        earliest_date = deleted_json.get("earliestDateAvailable")
+        if earliest_date and _parse_sf_datetime(earliest_date) > start:
+            return None  # Salesforce doesn't keep the deletions that far back
+        deleted_ids = [deleted_record["id"] for deleted_record in deleted_json.get("deletedRecords", [])]
+        return deleted_ids, deleted_json.get("latestDateCovered") or end.isoformat()
+
+    def _refresh_mirror(self):
+        """Refresh the local mirror of the RA records.
+
+        Private method that brings the SQLite mirror up to date with Salesforce.
+
+        Steps:
+            * If the mirror was never loaded, if ``url_query`` is not configured or if the last refresh is older
+              than the deleted records kept by Salesforce (30 days), load all the records
+            * Otherwise query only the records with a ``LastModifiedDate`` after the watermark, and the records
+              deleted since the last refresh
+            * Store the new watermark and deleted records checkpoint
+        :return: None
+        """
+        watermark = self._mirror.watermark
+        deleted_checkpoint = self._mirror.deleted_checkpoint
+        if watermark and deleted_checkpoint and self._url_query:
+            soql_watermark = _parse_sf_datetime(watermark).strftime("%Y-%m-%dT%H:%M:%SZ")
+            changed_records = self._query_records(f"WHERE LastModifiedDate >= {soql_watermark}")
+            deleted = self._get_deleted_record_ids(_parse_sf_datetime(deleted_checkpoint))
+            if changed_records is not None and deleted is not None:
+                deleted_ids, deleted_checkpoint = deleted
+                self._mirror.upsert(changed_records)
+                self._mirror.delete(deleted_ids)
+                self._mirror.set_checkpoints(max([watermark] + [record.LastModifiedDate for record in changed_records
+                                                                if record.LastModifiedDate]),
+                                             deleted_checkpoint)
+                self.logger.info(f"RA Library mirror refreshed : {len(changed_records)} records changed, "
+                                 f"{len(deleted_ids)} deleted, {self._mirror.count()} records in total.")
+                return
+            self.logger.warning("Cannot refresh the RA Library mirror incrementally. All records will be loaded.")
+
+        deleted_checkpoint = datetime.now(timezone.utc).isoformat()  # later deletions come with the next refresh
+        if self._url_query:
+            all_records = self._query_records()
+            if all_records is None:
+                self.logger.error("Couldn't query the Salesforce API to get the full records list. Program will close.")
+                exit(1)
+        else:
+            all_records = self._get_all_records()
+        self._mirror.replace_all(all_records)
+        self._mirror.set_checkpoints(max((record.LastModifiedDate for record in all_records
+                                          if record.LastModifiedDate),
+                                         default=deleted_checkpoint),  # empty library: the load start time
+                                     deleted_checkpoint)
+        self.logger.info(f"RA Library mirror loaded with {len(all_records)} records.")
+
     @property
     def existing_records(self):
         """Get the existing records.
 
-        Property that returns the existing records that are stored in `self._existing_records` in a dataframe format
-        :returns: A dataframe with all records queried from Salesforce
-        :rtype: pandas.DataFrame
+        Property that returns the existing records from the local mirror of the RA Library. Use
+        :code:`classes.record.records_to_dataframe()` to get a dataframe.
+        :returns: A list of :code:`classes.record.SfRecord` with all records queried from Salesforce
+        :rtype: list
+        """
+        return self._mirror.all_records()
+
+    @staticmethod
+    def _to_sf_record(record, record_id):
+        """Create the mirror entry of a record created from a RA record.
+
+        The ``LastModifiedDate`` is the creation time, until the next refresh brings the date set by Salesforce.
+
+        :param record: a RA record
+        :type record: classes.record.RaRecord
+        :param record_id: the ID of the created record
+        :type record_id: str
+        :rtype: classes.record.SfRecord
+        """
+        created_date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")  # Salesforce format
+        return SfRecord(Id=record_id, Name=record.Name, LastModifiedDate=created_date, Description=record.Description,
+                        Category=record.Category, OS=record.Type, Details=record.Doc)
+
+    def close(self):
+        """Close the local mirror of the RA records.
+
+        :return: None
+        """
+        self._mirror.close()
+
+    def get_field_metadata(self):
+        """Get the field metadata of the RA object.
+
+        Public method that returns the length and picklist values of the RA object fields, from the describe
+        endpoint. The result is cached locally in a JSON file and reused until it is older than the TTL
+        (``describe_cache_ttl`` in seconds, one day by default).
+
+        Steps:
+            * Return the cached metadata if the cache file is fresh enough
+            * Otherwise query the describe endpoint
+            * Keep only the name, length and active picklist values of each field and write them to the cache
+        :return: a dictionary ``{field_name: {"length": int, "picklist": list or None}}``, empty if the describe
+                 endpoint is not configured or cannot be reached
+        :rtype: dict
         """
-        if not self._existing_records.empty:
-            return self._existing_records
-        return pd.DataFrame()
+        cache_path = self._path_to_describe_cache
+        try:
+            if time.time() - os.path.getmtime(cache_path) < self._describe_cache_ttl:
+                with open(cache_path, encoding="utf-8") as f:
+                    self.logger.debug(f"Using cached object metadata from {cache_path}")
+                    return json.load(f)
+        except FileNotFoundError:
+            pass  # no cache yet
+        except Exception as err:
+            self.logger.exception(err)
+
+        if not self._url_describe:
+            self.logger.warning("No url_describe in the configuration. Records are validated without org metadata.")
+            return {}
+        describe_response = self._run_http_request("GET", self._url_describe)
+        if not describe_response:
+            self.logger.error("Couldn't query the describe endpoint. Records are validated without org metadata.")
+            return {}
+        try:
+            field_metadata = {
+                field["name"]: {
+                    "length": field.get("length") or None,  # 0 for fields without a length
+                    "picklist": [value["value"] for value in field.get("picklistValues", []) if value.get("active")]
+                                if field.get("type") == "picklist" else None
+                }
+                for field in describe_response.json()["fields"]
+            }
+        except KeyError as keyErr:
+            self.logger.exception(keyErr)
+            return {}
+        except ValueError as valueErr:  # The describe response is not JSON
+            self.logger.exception(valueErr)
+            self.logger.error("Invalid describe response. Records are validated without org metadata.")
+            return {}
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(field_metadata, f)
+        except Exception as err:
+            self.logger.exception(err)  # the metadata is still usable without the cache
+        return field_metadata
 
-    def _create_ra_record(self, df_row):
+    def _create_ra_record(self, record):
         """Create a RA record in Salesforce.
 
         Private method that creates a RA record in Salesforce database by leveraging the Salesforce API.
@@ -206,40 +558,40 @@ class Salesforce:
             * :code:`Details_URL__c` (link to the V6 Library documentation)
             * :code:`OS__c` (support OS, must be pre-created in Salesforce)
             * :code:`Name` (name of the RA, free text)
-        :param df_row: a dataframe row
-        :type df_row: pandas.Series
+        :param record: a RA record
+        :type record: classes.record.RaRecord
         :returns: a response object containing the record_id , None otherwise
         :rtype: requests.Response or None
         """
-        self.logger.debug("Creating record for " + df_row["Name"])
+        self.logger.debug("Creating record for %s", record.Name)
         try:
             create_record_dict = {
-                "Category__c": df_row["Category"],
-                "Description__c": df_row["Description"],
-                "Details_URL__c": df_row["Doc"],  # TODO Create a field for RA versions in SF
-                "OS__c": df_row["Type"],
-                "Name": df_row["Name"]
+                "Category__c": record.Category,
+                "Description__c": record.Description,
+                "Details_URL__c": record.Doc,  # TODO Create a field for RA versions in SF
+                "OS__c": record.Type,
+                "Name": record.Name
             }
-        except KeyError as keyErr:
-            self.logger.exception(keyErr)
+        except AttributeError as attrErr:
+            self.logger.exception(attrErr)
             return
         except Exception as err:
             self.logger.exception(err)
             return
         else:
-            create_record_json = json.dumps(create_record_dict, indent=4)
+            create_record_json = json.dumps(create_record_dict, separators=(",", ":"))
             create_record_response = self._run_http_request("POST",
                                                             self._url_to_record,
                                                             payload=create_record_json)
             return create_record_response
 
-    def _upload_json_file(self, df_row):
+    def _upload_json_file(self, record):
         """Upload a file to Salesforce.
 
         Private method that uploads a file (a JSON RA file) to Salesforce via API call.
 
         Steps:
-            * Get file path for df
+            * Get file path from the record
             * Open file in utf-8
             * Encode file to base64
             * Create payload
@@ -248,14 +600,14 @@ class Salesforce:
             * :code:`VersionData`: the content of the file per se, in base64
             * :code:`Title`: the path to the file
             * :code:`PathOnClient`: the path to the file
-        :param df_row: a dataframe row
-        :type df_row: pd.Series
+        :param record: a RA record
+        :type record: classes.record.RaRecord
         :return: a response object if success, None otherwise
         :rtype: requests.Response or None
         """
         try:
-            self.logger.debug(f"Uploading JSON file {df_row['Path']} for {df_row['Name']}")
-            json_file_path = df_row["Path"]
+            self.logger.debug("Uploading JSON file %s for %s", record.Path, record.Name)
+            json_file_path = record.Path
             with open(json_file_path, encoding='utf-8') as f:
                 base64_file = self.encode_to_b64_string(f.read())  # TODO Implement try catch
             file_upload_dict = {
@@ -266,18 +618,18 @@ class Salesforce:
         except FileNotFoundError as fileErr:
             self.logger.exception(fileErr)
             return
-        except KeyError as keyErr:
-            self.logger.exception(keyErr)
+        except TypeError as typeErr:  # No JSON file for this RA (Path is None)
+            self.logger.exception(typeErr)
             return
         except Exception as err:
             self.logger.exception(err)
             return
         else:
-            file_upload_json = json.dumps(file_upload_dict, indent=4)
+            file_upload_json = json.dumps(file_upload_dict, separators=(",", ":"))
             file_upload_response = self._run_http_request("POST", self._url_file_upload, payload=file_upload_json)
             return file_upload_response
 
-    def _grant_permission(self, create_record_response, file_upload_response):
+    def _grant_permission(self, record_id, file_id):
         """Grant view permissions to the uploaded JSON file.
 
         Private method that allows to grant permissions to the uploaded file in order to make it accessible and
@@ -289,24 +641,18 @@ class Salesforce:
             * Create a payload adding the `content_id` and the `record_id`
               (from record creation :code:`_create_ra_record()`)
             * Run POST request on the endpoint to grant the permissions
-        :param create_record_response: an API response coming from record creation endpoint
-        :type create_record_response: requests.Response
-        :param file_upload_response: an API response from the file upload endpoint (used to extract the content_id)
-        :type file_upload_response: requests.Response
-        :return: None
+        :param record_id: the id of the RA record (returned by the record creation endpoint)
+        :type record_id: str
+        :param file_id: the id of the uploaded file (returned by the file upload endpoint, used to extract
+                        the content_id)
+        :type file_id: str
+        :return: a response object if success, None otherwise
+        :rtype: requests.Response or None
         """
         try:
-            self.logger.debug(f"Granting file the view permissions")
-            create_record_json = create_record_response.json()
-            file_upload_json = file_upload_response.json()
-            file_perm_url = self._url_content_doc_id.format(file_upload_json["id"])  # get content doc ID of a document
+            self.logger.debug("Granting file the view permissions")
+            file_perm_url = self._url_content_doc_id.format(file_id)  # get content doc ID of a document
             content_id_response = self._run_http_request("GET", file_perm_url)
-        except AttributeError as attrErr:
-            self.logger.exception(attrErr)
-            return
-        except KeyError as keyErr:
-            self.logger.exception(keyErr)
-            return
         except Exception as err:
             self.logger.exception(err)
             return
@@ -321,7 +667,7 @@ class Salesforce:
                 "ContentDocumentId": content_id,
                 "ShareType": "V",
                 "Visibility": "AllUsers",
-                "LinkedEntityId": create_record_json["id"]
+                "LinkedEntityId": record_id
             }
         except KeyError as keyErr:
             self.logger.exception(keyErr)
@@ -333,7 +679,7 @@ class Salesforce:
             self.logger.exception(err)
             return
         else:
-            file_perm_json = json.dumps(file_perm_dict, indent=4)
+            file_perm_json = json.dumps(file_perm_dict, separators=(",", ":"))
             file_perm_response = self._run_http_request("POST", self._url_grant_permission, payload=file_perm_json)
             return file_perm_response
 
@@ -349,7 +695,7 @@ class Salesforce:
         :return: True if the deletion was a success, False otherwise
         :rtype: bool
         """
-        self.logger.debug(f"Deleting RA with ID {record_id}")
+        self.logger.debug("Deleting RA with ID %s", record_id)
         url_delete = self._url_delete_one.format(record_id)
         delete_response = self._run_http_request("DELETE", url_delete, None)
         try:
@@ -359,7 +705,8 @@ class Salesforce:
             return False
         else:
             if delete_json["success"]:
-                self.logger.debug(f"Record ID : {record_id} successfully deleted")
+                self.logger.debug("Record ID : %s successfully deleted", record_id)
+                self._mirror.delete([record_id])
                 return True
             else:
                 return False
@@ -380,86 +727,386 @@ class Salesforce:
         :return: True if delete successful False otherwise
         :rtype: bool
         """
-        df = self.existing_records
-        if not df.empty:  # if there are records
-            self.logger.info(f"There are {len(df.index)} RA records in the RA Library.")  # print # of records
-            num_groups = math.ceil(len(df.index)/200)  # create groups of max 200 records
-            df_chunks = np.array_split(df, num_groups)  # split it in chunks
-            for df_chunk in df_chunks:  # loop over the chunks
-                record_ids_list = df_chunk.loc[:, "Id"].to_list()  # extract all the IDs
-                records_str = ",".join(record_ids_list)  # join IDs in a string
-                delete_all_url = self._url_delete_all + records_str + "&allOrNone=false"  # concatenate param
-                delete_response = self._run_http_request("DELETE", delete_all_url, None)  # run delete request
-                if not delete_response:  # if delete fails
-                    self.logger.error("Couldn't delete records in Salesforce. Check the endpoint URL or API access.")
-                    return False
-                delete_json = delete_response.json()  # if deletion works, get the response json
-                failed_deletion_ids = [item["id"] for item in delete_json if not item["success"]]  # get failed IDs
-                if failed_deletion_ids:
-                    self.logger.error(f"Failed to delete the records with IDs  {failed_deletion_ids}")
-                if len(failed_deletion_ids) == len(df.index):  # check if all records got deleted
-                    self.logger.info("All records were deleted from the RA Library")
+        records = self.existing_records
+        if records:  # if there are records
+            self.logger.info(f"There are {len(records)} RA records in the RA Library.")  # print # of records
+            deleted_ids = self._delete_records([record.Id for record in records])
+            if deleted_ids is None:  # if delete fails
+                return False
+            if len(deleted_ids) == len(records):  # check if all records got deleted
+                self.logger.info("All records were deleted from the RA Library")
             return True
         else:
             self.logger.info("No records to delete.")
             return True
 
-    def process_dataframe(self, df, from_scratch):
+    def _delete_records(self, record_ids):
+        """Delete a list of records in Salesforce.
+
+        Private method that deletes records by groups of 200 (the maximum of one delete request), with
+        allOrNone=false so that one failed deletion doesn't fail the others.
+
+        :param record_ids: the IDs of the records to delete
+        :type record_ids: list
+        :return: the IDs of the records deleted successfully, None if a delete request failed
+        :rtype: list or None
+        """
+        deleted_ids = []
+        for chunk_start in range(0, len(record_ids), 200):  # loop over groups of max 200 records
+            record_ids_list = record_ids[chunk_start:chunk_start + 200]  # extract the IDs of the group
+            records_str = ",".join(record_ids_list)  # join IDs in a string
+            delete_all_url = self._url_delete_all + records_str + "&allOrNone=false"  # concatenate param
+            delete_response = self._run_http_request("DELETE", delete_all_url, None)  # run delete request
+            if not delete_response:  # if delete fails
+                self.logger.error("Couldn't delete records in Salesforce. Check the endpoint URL or API access.")
+                return None
+            delete_json = delete_response.json()  # if deletion works, get the response json
+            deleted_ids.extend(item["id"] for item in delete_json if item["success"])
+            self._mirror.delete(item["id"] for item in delete_json if item["success"])
+            failed_deletion_ids = [item["id"] for item in delete_json if not item["success"]]  # get failed IDs
+            if failed_deletion_ids:
+                self.logger.error(f"Failed to delete the records with IDs  {failed_deletion_ids}")
+        return deleted_ids
+
+    def _bulk_url(self, job_id, *path):
+        """Create the URL of a Bulk API 2.0 ingest job resource.
+
+        :param job_id: the ID of the ingest job
+        :param path: optional sub-resources (e.g. ``batches``, ``successfulResults``)
+        :return: the URL
+        :rtype: str
+        """
+        return "/".join([self._url_bulk_ingest.rstrip("/"), job_id, *path]) + "/"
+
+    @staticmethod
+    def _records_to_csv(records):
+        """Create the CSV data of a bulk ingest job.
+
+        The columns are the fields of the payload of :code:`_create_ra_record()`.
+
+        :param records: a list of RA records
+        :type records: list
+        :return: the CSV data
+        :rtype: str
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["Name", "Category__c", "Description__c", "Details_URL__c", "OS__c"])
+        for record in records:
+            writer.writerow([record.Name, record.Category, record.Description, record.Doc, record.Type])
+        return buffer.getvalue()
+
+    def _create_bulk_job(self):
+        """Create a Bulk API 2.0 insert ingest job on the RA object.
+
+        :return: the ID of the job, None if it couldn't be created
+        :rtype: str or None
+        """
+        job_dict = {
+            "object": self._ra_object_name,
+            "operation": "insert",
+            "contentType": "CSV",
+            "lineEnding": "LF"
+        }
+        job_response = self._run_http_request("POST",
+                                              self._url_bulk_ingest,
+                                              payload=json.dumps(job_dict, separators=(",", ":")))
+        if not job_response:
+            self.logger.error("Cannot create the bulk ingest job.")
+            return
+        try:
+            return job_response.json()["id"]
+        except (KeyError, ValueError) as err:
+            self.logger.exception(err)
+            self.logger.error("Invalid response to the bulk ingest job creation.")
+            return
+
+    def _run_bulk_job(self, job_id, records):
+        """Create RA records with a Bulk API 2.0 ingest job.
+
+        Private method that loads all the records with one asynchronous job instead of one request per record.
+
+        Steps:
+            * Upload the records as CSV to the job created by :code:`_create_bulk_job()` and mark the upload as
+              complete
+            * Poll the job state until the job is complete, failed or aborted. On timeout, abort the job so that
+              no record is created after the results are read
+            * Get the successful and failed results
+        :param job_id: the ID of the ingest job
+        :type job_id: str
+        :param records: a list of RA records
+        :type records: list
+        :return: a tuple with a dictionary ``{RA Name: record_id}`` of the created records and a dictionary
+                 ``{RA Name: error}`` of the records that failed
+        :rtype: tuple
+        """
+        self.logger.info(f"Bulk ingest job {job_id} created for {len(records)} RA records.")
+
+        upload_response = self._run_http_request("PUT",
+                                                 self._bulk_url(job_id, "batches"),
+                                                 payload=self._records_to_csv(records).encode("utf-8"),
+                                                 headers={"Content-Type": "text/csv"})
+        close_state = "UploadComplete" if upload_response else "Aborted"
+        close_response = self._run_http_request("PATCH",
+                                                self._bulk_url(job_id),
+                                                payload=json.dumps({"state": close_state}, separators=(",", ":")))
+        if not upload_response or not close_response:
+            self.logger.error(f"Cannot upload the records of bulk ingest job {job_id}.")
+            return {}, {record.Name: "bulk ingest job upload failed" for record in records}
+
+        started = time.time()
+        while True:  # Poll the job until Salesforce has processed it
+            time.sleep(self._bulk_poll_interval)
+            state_response = self._run_http_request("GET", self._bulk_url(job_id))
+            state_json = state_response.json() if state_response else {}
+            state = state_json.get("state")
+            self.logger.debug("Bulk ingest job %s is %s", job_id, state)
+            if state in ("JobComplete", "Failed", "Aborted"):
+                break
+            if time.time() - started > self._bulk_timeout:
+                self.logger.error(f"Bulk ingest job {job_id} didn't complete in {self._bulk_timeout} seconds. "
+                                  f"Aborting it.")
+                abort_response = self._run_http_request("PATCH",
+                                                        self._bulk_url(job_id),
+                                                        payload=json.dumps({"state": "Aborted"}, separators=(",", ":")))
+                if not abort_response:
+                    self.logger.error(f"Cannot abort bulk ingest job {job_id}. Records created after this point "
+                                      f"won't be journaled.")
+                state = "Aborted"
+                break
+        if state == "Failed":
+            self.logger.error(f"Bulk ingest job {job_id} failed : {state_json.get('errorMessage')}")
+
+        created, failed = {}, {}
+        success_response = self._run_http_request("GET",
+                                                  self._bulk_url(job_id, "successfulResults"),
+                                                  headers={"Accept": "text/csv"})
+        if success_response:
+            for row in csv.DictReader(io.StringIO(success_response.text)):
+                created[row["Name"]] = row["sf__Id"]
+        failed_response = self._run_http_request("GET",
+                                                 self._bulk_url(job_id, "failedResults"),
+                                                 headers={"Accept": "text/csv"})
+        if failed_response:
+            for row in csv.DictReader(io.StringIO(failed_response.text)):
+                failed[row["Name"]] = row["sf__Error"]
+        for record in records:  # Unprocessed records (job failed, aborted or timed out)
+            if record.Name not in created and record.Name not in failed:
+                failed[record.Name] = f"not processed by bulk ingest job {job_id} ({state})"
+        self.logger.info(f"Bulk ingest job {job_id} : {len(created)} records created, {len(failed)} failed.")
+        return created, failed
+
+    def _bulk_create_records(self, records, journal):
+        """Create the records of the RAs that are not created yet with one bulk ingest job.
+
+        Private method that replaces the create step of :code:`_process_record()`. The ingest job is created
+        first, then the existing records of the RAs are deleted (200 per request) and the new ones uploaded, so
+        that nothing is deleted if the job cannot be created. The created records are journaled, so that
+        :code:`_process_record()` only uploads the JSON files and grants the permissions for them.
+
+        :param records: the RA records to publish
+        :type records: list
+        :param journal: the journal of the current run
+        :type journal: classes.journal.SyncJournal
+        :return: a dictionary ``{RA Name: error}`` of the RAs whose record couldn't be created
+        :rtype: dict
+        """
+        pending_records = [record for record in records if "create" not in journal.completed_steps(record.Name)]
+        if not pending_records:
+            return {}
+        job_id = self._create_bulk_job()
+        if not job_id:
+            return {record.Name: "bulk ingest job not created" for record in pending_records}
+        names_by_id = {record_id: record.Name
+                       for record in pending_records
+                       for record_id in self._mirror.ids_for_name(record.Name)
+                       if not journal.is_deleted(record_id)}
+        deleted_ids = self._delete_records(list(names_by_id))
+        if deleted_ids is None:  # The existing records are still there, creating new ones would duplicate them
+            self._run_http_request("PATCH",
+                                   self._bulk_url(job_id),
+                                   payload=json.dumps({"state": "Aborted"}, separators=(",", ":")))
+            return {record.Name: "existing records not deleted" for record in pending_records}
+        for deleted_id in deleted_ids:
+            journal.record("delete", names_by_id[deleted_id], deleted_id)
+        created, failed = self._run_bulk_job(job_id, pending_records)
+        for ra_name, record_id in created.items():
+            journal.record("create", ra_name, record_id)
+        self._mirror.upsert([self._to_sf_record(record, created[record.Name])
+                             for record in pending_records if record.Name in created])
+        for ra_name, error in failed.items():
+            self.logger.error("Cannot create record for RA Name : %s (%s)", ra_name, error,
+                              extra={"ra": ra_name, "step": "create", "status": "failed"})
+        return failed
+
+    def process_dataframe(self, records, from_scratch, resume=False, rejected=None, bulk=False):
         """Process the list of RAs.
 
         Public method that initiate the processing of all provided RA lists.
 
         Steps:
+            * Open the sync journal (a new one, or the previous one if resuming)
             * If selected at runtime, delete all RAs in Salesforce
-            * Loop over the full list of RAs
-        :param df: a dataframe with full data (from JSON + categories file)
+            * If selected at runtime, create all the records with one bulk ingest job
+            * Process the RAs in a pool of ``max_concurrency`` threads; the requests in flight are limited by the
+              adaptive limiter of :code:`_run_http_request()`
+            * Keep track of the outcome of each RA in a summary
+            * If no RA failed, mark the run as completed in the journal
+        Summary statuses:
+            * :code:`loaded`: record created, file uploaded and permissions granted
+            * :code:`internal`: internal RA, not published
+            * :code:`invalid`: RA rejected by the pre-flight validation, not published
+            * :code:`create_failed`, :code:`upload_failed`, :code:`grant_failed`: the step at which the RA failed
+        :param records: the RA records with full data (from JSON + categories file), see
+                        :code:`JsonParser.records`
+        :type records: list
         :param from_scratch: if True recreate DB from scratch
         :type from_scratch: bool
+        :param resume: if True skip the steps recorded in the journal of a previous run
+        :type resume: bool
+        :param rejected: the Names of the RAs rejected by :code:`classes.validator.validate_dataframe()`
+        :type rejected: set
+        :param bulk: if True create the records with a Bulk API 2.0 ingest job, then upload the files and grant
+                     the permissions of the created records only
+        :type bulk: bool
+        :return: a dictionary with the RA Names as keys and their status as values
+        :rtype: dict
+        """
+        summary = {}
+        rejected = rejected or set()
+        if bulk and not (self._url_bulk_ingest and self._ra_object_name):
+            self.logger.error("--bulk needs url_bulk_ingest and ra_object_name in the configuration. "
+                              "Waitress will exit.")
+            exit(1)
+        journal = SyncJournal(self._path_to_journal, resume=resume)
+        try:
+            if from_scratch and not journal.library_emptied:  # Recreate DB from scratch
+                delete_status = self.delete_all_ras()
+                if not delete_status:
+                    self.logger.error("Unable to create the RA database from scratch. Waitress will exit.")
+                    exit(1)
+                journal.record("delete_all")
+            records_to_publish = []
+            for record in records:  # Loop over the full Remote Action records
+                if record.Internal:  # Check if RA is internal or public.
+                    summary[record.Name] = "internal"
+                    continue  # if internal we skip and don't publish it
+                if record.Name in rejected:
+                    summary[record.Name] = "invalid"
+                    continue
+                records_to_publish.append(record)
+            bulk_failed = set()
+            if bulk:  # Create all the records at once, files and permissions follow for the created ones
+                bulk_failed = set(self._bulk_create_records(records_to_publish, journal))
+            with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+                futures = [(record.Name, executor.submit(self._process_record, record, journal))
+                           for record in records_to_publish if record.Name not in bulk_failed]
+            for ra_name in bulk_failed:
+                summary[ra_name] = "create_failed"
+            for ra_name, future in futures:
+                summary[ra_name] = future.result()
+            if not any(status.endswith("_failed") for status in summary.values()):
+                journal.complete()  # Otherwise a --resume retries the failed RAs
+            self.logger.info(f"Concurrency settled at {self._limiter.limit} requests in flight.")
+        finally:
+            journal.close()
+        return summary
+
+    def _log_step(self, ra_name, step, started, status, error=None):
+        """Log the outcome and latency of a sync step.
+
+        The records carry the RA name, step, latency and status as structured fields (see
+        :code:`classes.logger.JsonLinesFormatter`). The DEBUG message is only logged when DEBUG is enabled.
+
+        :param ra_name: the RA Name
+        :param step: the sync step (delete, create, upload, grant)
+        :param started: the :code:`time.perf_counter()` value when the step started
+        :param status: ok or failed
+        :param error: an optional error message, logged at ERROR with the RA Name as its ``%s`` argument
         :return: None
         """
-        if from_scratch:  # Recreate DB from scratch
-            delete_status = self.delete_all_ras()
-            if not delete_status:
-                self.logger.error("Unable to create the RA database from scratch. Waitress will exit.")
-                exit(1)
-            self._existing_records = pd.DataFrame()
-        for index, row in df.iterrows():  # Loop over the full Remote Action records
-            if row["Internal"]:  # Check if RA is internal or public.
-                continue  # if internal we skip and don't publish it
-            if not self.existing_records.empty:  # if the sf db is not empty
-                if row["Name"] in self.existing_records["Name"].values:  # if the RA already exists
-                    ids_records_to_delete = self.existing_records. \
-                            loc[self.existing_records["Name"] == row["Name"], "Id"].tolist()  # get the list of ids
-                    for id_record_to_delete in ids_records_to_delete:
-                        self.logger.debug(f"{row['Name']} already exists in the library. It will be replaced.")
-                        self.logger.debug(f"Deleting record for RA Name : {row['Name']}")  # delete the existing record
-                        deletion_status = self.delete_one_ra(id_record_to_delete)
-                        if not deletion_status:  # If we cannot delete the record, we go to next record
-                            self.logger.error(f"Couldn't delete record for {row['Name']}")
-                            continue
-            self.logger.debug(f"Creating record for RA Name : {row['Name']}")
-            create_record_response = self._create_ra_record(row)  # RA record creation in SF
+        latency = round(time.perf_counter() - started, 3)
+        fields = {"ra": ra_name, "step": step, "latency": latency, "status": status}
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Step %s %s for RA Name : %s in %.3fs", step, status, ra_name, latency, extra=fields)
+        if error:
+            self.logger.error(error, ra_name, extra=fields)
+
+    def _process_record(self, record, journal):
+        """Load one RA to Salesforce.
+
+        Private method that runs the steps missing from the journal for one RA: replace the existing records,
+        create the record, upload the JSON file and grant the permissions. Each completed step is journaled
+        with the id returned by Salesforce, so that a partially loaded RA is repaired from where it stopped.
+
+        :param record: a RA record
+        :type record: classes.record.RaRecord
+        :param journal: the journal of the current run
+        :type journal: classes.journal.SyncJournal
+        :return: the status of the RA
+        :rtype: str
+        """
+        ra_name = record.Name
+        ra_started = time.perf_counter()
+        completed_steps = journal.completed_steps(ra_name)
+        if "grant" in completed_steps:
+            self.logger.debug("%s already loaded according to the journal. Skipping.", ra_name,
+                              extra={"ra": ra_name, "status": "loaded"})
+            return "loaded"
+
+        record_id = completed_steps.get("create")
+        if record_id is None:
+            ids_records_to_delete = self._mirror.ids_for_name(ra_name)  # ids if the RA already exists
+            for id_record_to_delete in ids_records_to_delete:
+                if journal.is_deleted(id_record_to_delete):
+                    continue
+                self.logger.debug("%s already exists in the library. It will be replaced.", ra_name)
+                started = time.perf_counter()
+                deletion_status = self.delete_one_ra(id_record_to_delete)  # delete the existing record
+                if not deletion_status:  # If we cannot delete the record, we go to next record
+                    self._log_step(ra_name, "delete", started, "failed", "Couldn't delete record for %s")
+                    continue
+                journal.record("delete", ra_name, id_record_to_delete)
+                self._log_step(ra_name, "delete", started, "ok")
+            started = time.perf_counter()
+            create_record_response = self._create_ra_record(record)  # RA record creation in SF
             if not create_record_response:  # if we cannot create the record, go to next one
-                self.logger.error(f"Cannot reach endpoint to create record for RA Name : {row['Name']}")
-                continue
-            if not create_record_response.json()["success"]:  # If creation not successful, next record
-                self.logger.error(f"Cannot create record for RA Name : {row['Name']}")
-                continue
-            self.logger.debug(f"Record created with success for RA Name : {row['Name']}")
-            self.logger.debug(f"Uploading JSON file for RA Name : {row['Name']}")  # RA JSON file upload
-            file_upload_response = self._upload_json_file(row)
+                self._log_step(ra_name, "create", started, "failed",
+                               "Cannot reach endpoint to create record for RA Name : %s")
+                return "create_failed"
+            create_record_json = create_record_response.json()
+            if not create_record_json["success"]:  # If creation not successful, next record
+                self._log_step(ra_name, "create", started, "failed", "Cannot create record for RA Name : %s")
+                return "create_failed"
+            record_id = create_record_json["id"]
+            journal.record("create", ra_name, record_id)
+            self._mirror.upsert([self._to_sf_record(record, record_id)])
+            self._log_step(ra_name, "create", started, "ok")
+
+        file_id = completed_steps.get("upload")
+        if file_id is None:
+            started = time.perf_counter()
+            file_upload_response = self._upload_json_file(record)  # RA JSON file upload
             if not file_upload_response:
-                self.logger.error(f"Cannot reach endpoint to upload JSON file for RA Name : {row['Name']}")
-                continue
-            if not file_upload_response.json()["success"]:  # If file NOT upload successfully
-                self.logger.error(f"Cannot upload file for RA Name : {row['Name']}")
-                continue
-            self.logger.debug(f"RA JSON file successfully upload for RA Name : {row['Name']}")
-            self.logger.debug(f"Granting permission for record for RA Name : {row['Name']}")  # Granting permissions
-            file_perm_response = self._grant_permission(create_record_response, file_upload_response)
-            if not file_perm_response:
-                self.logger.error(f"Cannot upload file for RA Name : {row['Name']}")
-                continue
-            if not file_perm_response.json()["success"]:  # If permission NOT given successfully
-                continue
-            self.logger.info(f"{row['Name']} was loaded to Salesforce successfully.")
+                self._log_step(ra_name, "upload", started, "failed",
+                               "Cannot reach endpoint to upload JSON file for RA Name : %s")
+                return "upload_failed"
+            file_upload_json = file_upload_response.json()
+            if not file_upload_json["success"]:  # If file NOT upload successfully
+                self._log_step(ra_name, "upload", started, "failed", "Cannot upload file for RA Name : %s")
+                return "upload_failed"
+            file_id = file_upload_json["id"]
+            journal.record("upload", ra_name, file_id)
+            self._log_step(ra_name, "upload", started, "ok")
+
+        started = time.perf_counter()
+        file_perm_response = self._grant_permission(record_id, file_id)  # Granting permissions
+        if not file_perm_response or not file_perm_response.json()["success"]:
+            self._log_step(ra_name, "grant", started, "failed", "Cannot grant permissions on file for RA Name : %s")
+            return "grant_failed"
+        journal.record("grant", ra_name)
+        self._log_step(ra_name, "grant", started, "ok")
+        self.logger.info("%s was loaded to Salesforce successfully.", ra_name,
+                         extra={"ra": ra_name, "latency": round(time.perf_counter() - ra_started, 3),
+                                "status": "loaded"})
+        return "loaded"
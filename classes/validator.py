@@ -0,0 +1,83 @@
+import logging
+import pandas as pd
+
+module_logger = logging.getLogger('waitress.validator')
+
+# Columns of the RaRecord dataframe and the Salesforce fields they are loaded to (see Salesforce._create_ra_record)
+FIELD_MAPPING = {
+    "Name": "Name",
+    "Category": "Category__c",
+    "Description": "Description__c",
+    "Doc": "Details_URL__c",
+    "Type": "OS__c",
+}
+
+
+def _is_blank(series):
+    """Return a boolean mask of the missing or empty values of a series."""
+    return series.isna() | series.astype(str).str.strip().eq("")
+
+
+def validate_dataframe(df_records, field_metadata):
+    """Check the RAs against the org metadata before anything is sent to Salesforce.
+
+    Every check runs on the whole dataframe at once. Internal RAs are not published, so they are not checked.
+
+    Checks:
+        * the RA has a JSON file
+        * :code:`Category` and :code:`Doc` are not empty
+        * :code:`Type` is not empty (the JSON has a ``scriptInfo`` with a Windows and/or macOS script)
+        * :code:`Category` and :code:`Type` are active picklist values of the org
+        * the text values fit in the field lengths of the org
+    :param df_records: the RA records as a dataframe (see :code:`classes.record.records_to_dataframe()`)
+    :type df_records: pandas.DataFrame
+    :param field_metadata: the field metadata of the org (see :code:`Salesforce.get_field_metadata()`). The
+                           picklist and length checks are skipped when it is empty
+    :type field_metadata: dict
+    :return: a dataframe with the ``Name`` and the ``Errors`` of every invalid RA
+    :rtype: pandas.DataFrame
+    """
+    df = df_records.loc[~df_records["Internal"].astype(bool)]
+    errors = pd.DataFrame(index=df.index)
+
+    errors["no JSON file"] = df["Path"].isna()
+    errors["empty Category"] = _is_blank(df["Category"])
+    errors["empty Doc"] = _is_blank(df["Doc"])
+    errors["empty Type (no scriptInfo or no script)"] = df["Path"].notna() & _is_blank(df["Type"])
+
+    for column, field_name in FIELD_MAPPING.items():
+        metadata = field_metadata.get(field_name)
+        if not metadata:
+            continue
+        if metadata.get("picklist") is not None:
+            errors[f"{column} is not a valid {field_name} value"] = \
+                df[column].notna() & ~df[column].isin(metadata["picklist"])
+        if metadata.get("length"):
+            errors[f"{column} longer than {metadata['length']} characters"] = \
+                df[column].fillna("").astype(str).str.len() > metadata["length"]
+
+    invalid = errors.any(axis=1)
+    if not invalid.any():
+        return pd.DataFrame(columns=["Name", "Errors"])
+    report = pd.DataFrame({
+        "Name": df.loc[invalid, "Name"],
+        "Errors": errors.loc[invalid].apply(lambda row: ", ".join(row.index[row]), axis=1)
+    })
+    return report
+
+
+def log_validation_report(report, env):
+    """Log the RAs rejected by the validation in one report.
+
+    :param report: the dataframe returned by :code:`validate_dataframe()`
+    :type report: pandas.DataFrame
+    :param env: the environment name of the org
+    :type env: str
+    :return: None
+    """
+    if report.empty:
+        module_logger.info(f"[{env}] All the RAs passed the pre-flight validation.")
+        return
+    module_logger.error(f"[{env}] {len(report.index)} RAs rejected by the pre-flight validation:")
+    for name, errors in report.itertuples(index=False, name=None):
+        module_logger.error(f"[{env}]   {name} : {errors}", extra={"ra": name, "status": "invalid"})
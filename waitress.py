@@ -1,11 +1,96 @@
 import argparse
 import logging
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 from utils import load_config, save_to_excel
 
 from classes.salesforce import Salesforce
 from classes.parser import JsonParser
 from classes.logger import Logger
+from classes.record import RaRecord, SfRecord, records_to_dataframe
+from classes.validator import validate_dataframe, log_validation_report
+
+
+def sync_org(prog_config, records, df_records, args):
+    """Run the selected action against one Salesforce org.
+
+    Runs in a worker thread, one per configuration file. The parsed data is shared between all the orgs and
+    is only read here.
+
+    :param prog_config: the configuration of the org
+    :type prog_config: dict
+    :param records: the RA records with full data (from JSON + categories file)
+    :type records: list
+    :param df_records: the same records as a dataframe, used for the pre-flight validation
+    :type df_records: pandas.DataFrame
+    :param args: the parsed command line arguments
+    :type args: argparse.Namespace
+    :return: a report with the ``env``, a ``success`` flag, the per-RA ``summary`` and the ``wire_stats`` of
+             the org
+    :rtype: dict
+    """
+    report = {"env": prog_config.get("env"), "success": False, "summary": {}, "wire_stats": {}}
+    salesforce = None
+    try:
+        salesforce = Salesforce(prog_config)  # Create a Salesforce object to manage API queries
+        if args.delete_only:  # This is in case we only want to empty the Salesforce Library
+            report["success"] = salesforce.delete_all_ras()
+        elif args.export:
+            save_to_excel(records_to_dataframe(salesforce.existing_records, SfRecord),
+                          f"all_existing_sf_records_{salesforce.env}")
+            report["success"] = True
+        else:
+            validation_report = validate_dataframe(df_records, salesforce.get_field_metadata())
+            log_validation_report(validation_report, salesforce.env)
+            report["summary"] = salesforce.process_dataframe(records,
+                                                             from_scratch=args.from_scratch,
+                                                             resume=args.resume,
+                                                             rejected=set(validation_report["Name"]),
+                                                             bulk=args.bulk)
+            report["success"] = True
+    except SystemExit:  # The Salesforce object exits on fatal errors, we only want to stop this org
+        logging.getLogger("waitress").error(f"Synchronisation of {report['env']} stopped on a fatal error.")
+    except Exception as err:  # Keep the reports of the other orgs
+        logging.getLogger("waitress").exception(err)
+        logging.getLogger("waitress").error(f"Synchronisation of {report['env']} stopped on an unexpected error.")
+    finally:
+        if salesforce:
+            report["wire_stats"] = salesforce.wire_stats
+            salesforce.close()
+    return report
+
+
+def log_reports(reports):
+    """Log a combined report of all the synchronised orgs.
+
+    :param reports: the reports returned by :code:`sync_org()`
+    :type reports: list
+    :return: True if no org stopped on a fatal error, False otherwise
+    :rtype: bool
+    """
+    logger = logging.getLogger("waitress")
+    all_success = True
+    for report in reports:
+        statuses = Counter(report["summary"].values())
+        failed = sorted(name for name, status in report["summary"].items() if status.endswith("_failed"))
+        logger.info(f"[{report['env']}] {'completed' if report['success'] else 'FAILED'} - "
+                    f"loaded: {statuses['loaded']}, internal: {statuses['internal']}, invalid: {statuses['invalid']}, "
+                    f"failed: {len(failed)}")
+        if failed:
+            logger.error(f"[{report['env']}] RAs not loaded: {failed}")
+        wire_stats = report["wire_stats"]
+        if wire_stats:
+            logger.info(f"[{report['env']}] sent {wire_stats['sent'] / 1024:.1f} KB "
+                        f"({wire_stats['sent_uncompressed'] / 1024:.1f} KB uncompressed), "
+                        f"received {wire_stats['received'] / 1024:.1f} KB "
+                        f"({wire_stats['received_uncompressed'] / 1024:.1f} KB uncompressed)")
+            if wire_stats["received_unsized"]:
+                logger.info(f"[{report['env']}] {wire_stats['received_unsized']} chunked responses of unknown wire "
+                            f"size are not counted in the received bytes")
+        all_success = all_success and report["success"]
+    return all_success
 
 
 def main():
@@ -14,7 +99,8 @@ def main():
     my_parser.add_argument('-c',
                            '--config',
                            required=True,
-                           help='Path to a JSON Configuration file.')
+                           nargs='+',
+                           help='Path to one or several JSON Configuration files (one per org).')
     my_parser.add_argument("-d",
                            "--delete_only",
                            action="store_true",
@@ -23,10 +109,22 @@ def main():
                            "--from_scratch",
                            action="store_true",
                            help="Delete and repopulate the RA Library from scratch.")
+    my_parser.add_argument("-b",
+                           "--bulk",
+                           action="store_true",
+                           help="Create the records with one Bulk API 2.0 ingest job instead of one request each.")
+    my_parser.add_argument("-r",
+                           "--resume",
+                           action="store_true",
+                           help="Resume an interrupted run from its journal, skipping the completed steps.")
     my_parser.add_argument('-v',
                            '--verbose',
                            action='store_true',
                            help='Enable extra verbose for debugging')
+    my_parser.add_argument('-j',
+                           '--log_json',
+                           action='store_true',
+                           help='Write the logs as JSON lines with the RA name, step, latency and status.')
     my_parser.add_argument('-i',
                            '--diff',
                            action='store_true',
@@ -37,34 +135,40 @@ def main():
                            help='Export existing SF Library to Excel file and quits.')
 
     args = my_parser.parse_args()  # Parse arguments in command line
-    prog_config = load_config(args.config)  # Load configuration provided as argument
+    prog_configs = [load_config(path) for path in args.config]  # Load configurations provided as argument
 
     logger = Logger(logging.DEBUG if args.verbose else logging.INFO)
-    logger.set_handler(file=True)
+    logger.set_handler(file=True, use_queue=True, structured=args.log_json)
     logger.logger.info("Initiating RAs Salesforce Library Loader")
 
-    json_parser = JsonParser(prog_config)  # Initiate a JsonParser object
-    json_parser.parse_json_folder()  # Parse the JSON folder to extract metadata
+    envs = [prog_config.get("env") for prog_config in prog_configs]
+    if not all(envs) or len(set(envs)) < len(envs):  # The journal and mirror of each org are named after its env
+        logger.logger.error(f"Every configuration must have a distinct, non-empty env (got {envs}). "
+                            f"Waitress will exit.")
+        exit(1)
 
-    df = json_parser.df_all  # Get the full dataframe will all RAs data from the categories.xlsx file
+    sources = {(prog_config["path_to_json"], prog_config["remote_actions_metadata"]) for prog_config in prog_configs}
+    if len(sources) > 1:  # The data is parsed once, so all the orgs must share the same sources
+        logger.logger.error("All the configurations must use the same path_to_json and remote_actions_metadata. "
+                            "Waitress will exit.")
+        exit(1)
 
-    salesforce = Salesforce(prog_config)  # Create a Salesforce object to manage API queries
-
-    if args.delete_only:  # This is in case we only want to empty the Salesforce Library
-        delete_status = salesforce.delete_all_ras()
-        exit(0) if delete_status else exit(1)
+    json_parser = JsonParser(prog_configs[0])  # Initiate a JsonParser object
+    json_parser.parse_json_folder()  # Parse the JSON folder to extract metadata
 
     if args.diff:
         delta = json_parser.get_delta_dataframe()
         logger.logger.info(f"The delta between Repo and SF Library is {delta}")
         exit(0)
 
-    if args.export:
-        save_to_excel(salesforce.existing_records, "all_existing_sf_records")
-        exit(0)
+    records = json_parser.records  # Get the full list of RAs with data from the categories.xlsx file
+    df_records = records_to_dataframe(records, RaRecord)  # Same records as columns for the validation, no merge
+
+    with ThreadPoolExecutor(max_workers=len(prog_configs)) as executor:  # One Salesforce object per org
+        reports = list(executor.map(lambda prog_config: sync_org(prog_config, records, df_records, args),
+                                    prog_configs))
 
-    salesforce.process_dataframe(df,
-                                 from_scratch=args.from_scratch)
+    exit(0) if log_reports(reports) else exit(1)
 
 
 if __name__ == "__main__":